@@ -9,11 +9,26 @@ to specify their coding requirements and generate code.
 import streamlit as st
 import json
 import asyncio
+import logging
+import re
+import tarfile
 import zipfile
 import io
-import os
-from datetime import datetime
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, AsyncIterator, Awaitable, Callable, Tuple
+
+from streamlit.delta_generator import DeltaGenerator
+
+try:
+    from markdown_it import MarkdownIt
+    import linkify_it  # noqa: F401  # Required by the gfm-like preset for autolinks
+except ImportError:  # Optional, assistant turns fall back to st.markdown without them
+    MarkdownIt = None
+
+try:
+    import zstandard
+except ImportError:  # Optional, only used for large generated projects
+    zstandard = None
 
 from .handlers import (
     initialize_session_state,
@@ -27,7 +42,38 @@ from .components import (
     footer_component,
     display_status,
 )
-from workflows.agent_orchestration_engine import execute_chat_based_planning_pipeline
+from workflows.agent_orchestration_engine import run_chat_planning_agent
+
+# Publish streamed assistant output at most ~20 times per second,
+# and only once enough new text has accumulated. The planning agent doesn't
+# stream tokens yet (see generate_technical_plan), so nothing is throttled today.
+STREAM_MIN_INTERVAL = 0.05
+STREAM_MIN_BATCH_CHARS = 8
+
+# Requirements longer than this are treated as detailed enough to plan from
+MIN_REQUIREMENTS_LENGTH = 50
+
+# Older messages beyond this are folded into a summary
+MAX_RETAINED_MESSAGES = 40
+SUMMARY_LINE_LENGTH = 120
+# Characters escaped in summary lines so evicted turns stay plain text
+_MARKDOWN_SPECIAL_CHARS = re.compile(r"([\\`*_{}\[\]()<>#+\-.!|~$:])")
+MAX_SUMMARY_LINES = 20
+
+# Markdown renderer for assistant messages, matching st.markdown's GitHub-flavored
+# output (tables, strikethrough, autolinks); raw HTML in model output is escaped
+_MARKDOWN = MarkdownIt("gfm-like", {"html": False}) if MarkdownIt else None
+
+# Generated projects larger than this are compressed; smaller ones are stored
+ARCHIVE_COMPRESSION_THRESHOLD = 1024 * 1024
+
+
+@st.cache_resource
+def get_planning_agent() -> Tuple[Callable[..., Awaitable[Any]], logging.Logger]:
+    """Get the planning agent and its logger, shared across reruns and sessions"""
+    logger = logging.getLogger("chat_planning")
+    logger.setLevel(logging.INFO)
+    return run_chat_planning_agent, logger
 
 
 def setup_chat_page_config():
@@ -40,55 +86,21 @@ def setup_chat_page_config():
     )
 
 
-def apply_chat_styles():
-    """Apply custom styles for chat interface"""
-    st.markdown(
-        """
+@st.cache_resource
+def get_chat_styles() -> str:
+    """Build the chat interface stylesheet once and share it across reruns"""
+    return """
         <style>
-        .chat-container {
-            background-color: #1e1e1e;
-            border-radius: 10px;
-            padding: 20px;
-            margin-bottom: 20px;
-            height: 500px;
-            overflow-y: auto;
-        }
-        .message {
+        header.stHeader { visibility: hidden; }
+        [data-testid="stChatMessage"] pre {
+            background-color: #252526;
+            border-radius: 5px;
             padding: 10px 15px;
-            margin: 10px 0;
-            border-radius: 15px;
-            max-width: 80%;
-            word-wrap: break-word;
-        }
-        .user-message {
-            background-color: #007acc;
-            color: white;
-            margin-left: auto;
-            text-align: right;
-        }
-        .assistant-message {
-            background-color: #2d2d30;
-            color: #e0e0e0;
-            margin-right: auto;
-        }
-        .typing-indicator {
-            display: inline-block;
-        }
-        .typing-dot {
-            animation: typing 1.4s infinite ease-in-out;
-            background-color: #e0e0e0;
-            border-radius: 50%;
-            display: inline-block;
-            height: 8px;
-            margin-right: 4px;
-            width: 8px;
+            overflow-x: auto;
         }
-        .typing-dot:nth-child(1) { animation-delay: 0s; }
-        .typing-dot:nth-child(2) { animation-delay: 0.2s; }
-        .typing-dot:nth-child(3) { animation-delay: 0.4s; }
-        @keyframes typing {
-            0%, 60%, 100% { transform: translateY(0); }
-            30% { transform: translateY(-5px); }
+        [data-testid="stChatMessage"] code {
+            font-family: "Source Code Pro", monospace;
+            font-size: 0.875em;
         }
         .code-plan {
             background-color: #252526;
@@ -106,9 +118,12 @@ def apply_chat_styles():
             text-align: center;
         }
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def apply_chat_styles():
+    """Apply custom styles for chat interface"""
+    st.html(get_chat_styles())
 
 
 def initialize_chat_session_state():
@@ -118,58 +133,203 @@ def initialize_chat_session_state():
     # Chat-specific state variables
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "summary" not in st.session_state:
+        st.session_state.summary = []
+    if "summary_omitted" not in st.session_state:
+        st.session_state.summary_omitted = 0
     if "current_plan" not in st.session_state:
         st.session_state.current_plan = None
     if "code_generated" not in st.session_state:
         st.session_state.code_generated = False
-    if "generated_code_path" not in st.session_state:
-        st.session_state.generated_code_path = None
+    if "generated_code_bytes" not in st.session_state:
+        st.session_state.generated_code_bytes = None
+    if "generated_code_name" not in st.session_state:
+        st.session_state.generated_code_name = None
+    if "generated_code_mime" not in st.session_state:
+        st.session_state.generated_code_mime = None
     if "chat_stage" not in st.session_state:
         st.session_state.chat_stage = "greeting"  # greeting, collecting_requirements, planning, generating
 
 
-def display_chat_messages():
-    """Display chat messages in the chat container"""
-    with st.container():
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-        
-        # Display all messages
-        for message in st.session_state.messages:
-            if message["role"] == "user":
-                st.markdown(
-                    f'<div class="message user-message">{message["content"]}</div>',
-                    unsafe_allow_html=True,
-                )
-            else:
-                st.markdown(
-                    f'<div class="message assistant-message">{message["content"]}</div>',
-                    unsafe_allow_html=True,
-                )
-        
-        # Show typing indicator if assistant is "thinking"
-        if st.session_state.get("assistant_typing", False):
-            st.markdown(
-                '<div class="message assistant-message">'
-                '<div class="typing-indicator">'
-                '<span class="typing-dot"></span>'
-                '<span class="typing-dot"></span>'
-                '<span class="typing-dot"></span>'
-                '</div>'
-                '</div>',
-                unsafe_allow_html=True,
-            )
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop that runs this session's async work across reruns"""
+    loop = st.session_state.get("event_loop")
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        st.session_state.event_loop = loop
+    return loop
+
+
+def _render_markdown(content: str) -> Optional[str]:
+    """Render assistant markdown to HTML once, instead of on every rerun
+
+    Returns None when markdown-it-py isn't installed.
+    """
+    return _MARKDOWN.render(content) if _MARKDOWN else None
+
+
+def _write_assistant_content(target: DeltaGenerator, content: str, rendered: Optional[str]):
+    """Write assistant content from its pre-rendered HTML, or as markdown without it"""
+    if rendered is None:
+        target.markdown(content)
+    else:
+        target.html(rendered)
+
+
+def _escape_markdown(text: str) -> str:
+    """Backslash-escape markdown syntax so the text renders literally"""
+    return _MARKDOWN_SPECIAL_CHARS.sub(r"\\\1", text)
+
+
+def summarize_messages(evicted: List[Dict[str, Any]]) -> List[str]:
+    """Summarize evicted messages as one short line per turn"""
+    lines = []
+    for message in evicted:
+        speaker = "You" if message["role"] == "user" else "Assistant"
+        first_line = next(
+            (line.strip() for line in message["content"].splitlines() if line.strip()), ""
+        )
+        if len(first_line) > SUMMARY_LINE_LENGTH:
+            first_line = first_line[:SUMMARY_LINE_LENGTH].rstrip() + "…"
+        # Escape after truncating so a cut can't leave a half-open construct
+        lines.append(f"- **{speaker}:** {_escape_markdown(first_line)}")
+    return lines
+
+
+def trim_chat_history() -> int:
+    """Fold the oldest messages into the running summary once history grows too long
+
+    Returns the number of messages evicted.
+    """
+    messages = st.session_state.messages
+    overflow = len(messages) - MAX_RETAINED_MESSAGES
+    if overflow <= 0:
+        return 0
+
+    # Evict up to the next user turn so the retained tail starts on a prompt,
+    # never on an assistant reply whose prompt was evicted
+    evict_count = overflow
+    while evict_count < len(messages) and messages[evict_count]["role"] != "user":
+        evict_count += 1
+    summary = st.session_state.summary + summarize_messages(messages[:evict_count])
+    del messages[:evict_count]
+
+    # Keep only the most recent summary lines and count the rest
+    dropped = max(len(summary) - MAX_SUMMARY_LINES, 0)
+    st.session_state.summary = summary[dropped:]
+    st.session_state.summary_omitted += dropped
+    return evict_count
+
+
+def _render_messages(messages: List[Dict[str, Any]]):
+    """Write each message into its own chat bubble"""
+    for message in messages:
+        bubble = st.chat_message(message["role"])
+        if message["role"] == "user":
+            # User turns are plain text and don't need the markdown parser
+            bubble.text(message["content"])
+        else:
+            _write_assistant_content(bubble, message["content"], message["html"])
+
+
+def render_chat_history(history_placeholder: DeltaGenerator) -> int:
+    """Write all finalized messages into the history placeholder
+
+    Returns the number of messages written.
+    """
+    with history_placeholder.container():
+        if st.session_state.summary:
+            with st.expander("Earlier conversation (summary)"):
+                summary = "\n".join(st.session_state.summary)
+                if st.session_state.summary_omitted:
+                    summary = f"_{st.session_state.summary_omitted} earlier messages not shown_\n\n{summary}"
+                st.markdown(summary)
+        _render_messages(st.session_state.messages)
+    return len(st.session_state.messages)
+
+
+def commit_chat_history(
+    history_placeholder: DeltaGenerator,
+    live_placeholder: DeltaGenerator,
+    committed_count: int,
+    evicted_count: int,
+):
+    """Show the messages added this run without re-rendering the history
+
+    New messages replace the live turn. The history placeholder is only
+    rewritten when eviction shifted the messages it already shows.
+    """
+    if evicted_count:
+        render_chat_history(history_placeholder)
+        live_placeholder.empty()
+    else:
+        with live_placeholder.container():
+            _render_messages(st.session_state.messages[committed_count:])
+
+
+def display_chat_messages() -> Tuple[DeltaGenerator, DeltaGenerator, int]:
+    """Display chat messages in the chat container
+
+    Returns the placeholder holding the finalized history, the placeholder
+    reserved for the turn that is currently in progress, and the number of
+    messages already shown in the history.
+    """
+    with st.container(height=500):
+        history_placeholder = st.empty()
+        live_placeholder = st.empty()
+
+    committed_count = render_chat_history(history_placeholder)
+
+    return history_placeholder, live_placeholder, committed_count
 
 
 def add_message(role: str, content: str):
-    """Add a message to the chat history"""
-    st.session_state.messages.append({"role": role, "content": content})
+    """Add a message to the chat history, pre-rendering assistant markdown once"""
+    message = {"role": role, "content": content}
+    if role == "assistant":
+        message["html"] = _render_markdown(content)
+    st.session_state.messages.append(message)
+
+
+async def stream_assistant_message(
+    chunks: AsyncIterator[str], live_placeholder: DeltaGenerator
+) -> str:
+    """Append an assistant message and render its content as chunks arrive"""
+    add_message("assistant", "")
+    message = st.session_state.messages[-1]
+    body = live_placeholder.chat_message("assistant").empty()
+
+    published_len = 0
+    last_publish = 0.0
+    try:
+        async for chunk in chunks:
+            message["content"] += chunk
+
+            # Throttle UI updates so the markdown isn't re-rendered for every token
+            now = time.monotonic()
+            if (
+                len(message["content"]) - published_len >= STREAM_MIN_BATCH_CHARS
+                and now - last_publish >= STREAM_MIN_INTERVAL
+            ):
+                _write_assistant_content(
+                    body, message["content"], _render_markdown(message["content"])
+                )
+                published_len = len(message["content"])
+                last_publish = now
+    except BaseException:
+        # Don't leave a half-streamed message in the history
+        if st.session_state.messages and st.session_state.messages[-1] is message:
+            st.session_state.messages.pop()
+        live_placeholder.empty()
+        raise
 
+    message["html"] = _render_markdown(message["content"])
+    _write_assistant_content(body, message["content"], message["html"])
+    return message["content"]
 
-def get_assistant_greeting() -> str:
-    """Get the assistant's initial greeting message"""
-    return """👋 Hello! I'm your specialized AI coding assistant. I'm here to help you generate code through an interactive conversation.
+
+# The assistant's initial greeting, with its HTML pre-rendered at import time
+_GREETING = """👋 Hello! I'm your specialized AI coding assistant. I'm here to help you generate code through an interactive conversation.
 
 Please tell me what kind of project or functionality you'd like to build. The more details you provide, the better I can understand your requirements.
 
@@ -181,93 +341,94 @@ For example, you could describe:
 - Any other coding project you have in mind
 
 I'll ask follow-up questions if I need clarification, and then create a technical implementation plan for you. When we're ready, I'll generate the actual code!"""
+_GREETING_MESSAGE = {
+    "role": "assistant",
+    "content": _GREETING,
+    "html": _render_markdown(_GREETING),
+}
+
+
+def has_sufficient_detail(user_input: str) -> bool:
+    """Check whether the requirements are detailed enough to plan from"""
+    # In a real implementation, this would be more sophisticated
+    return len(user_input) > MIN_REQUIREMENTS_LENGTH
+
+
+async def _handle_greeting(user_input: str, live_placeholder: DeltaGenerator):
+    """Handle the first user message after the greeting"""
+    # Move to requirements collection stage
+    st.session_state.chat_stage = "collecting_requirements"
+    response = "Thanks for that introduction! Let me ask a few questions to better understand your requirements."
+    add_message("assistant", response)
+
+
+async def _handle_collecting(user_input: str, live_placeholder: DeltaGenerator):
+    """Handle a message while collecting requirements"""
+    # Check if we have enough information to create a plan
+    if has_sufficient_detail(user_input):
+        # Generate technical plan, streaming it into the live placeholder
+        await stream_assistant_message(
+            generate_technical_plan(user_input), live_placeholder
+        )
+        st.session_state.chat_stage = "planning"
+    else:
+        # Ask for more details
+        response = "I'd like to understand your requirements better. Could you provide more details about what you're looking to build?"
+        add_message("assistant", response)
 
 
-async def process_user_input(user_input: str):
+async def _handle_planning(user_input: str, live_placeholder: DeltaGenerator):
+    """Handle a message once a technical plan has been proposed"""
+    # Check if user wants to generate code
+    if user_input.strip().lower() == "/code":
+        # Generate code
+        code_response = generate_code_from_plan()
+        add_message("assistant", code_response)
+        st.session_state.chat_stage = "generating"
+    else:
+        # Continue refining requirements
+        response = "I'm still collecting requirements. When you're ready to generate code based on the plan, please type `/code`."
+        add_message("assistant", response)
+
+
+async def _handle_generating(user_input: str, live_placeholder: DeltaGenerator):
+    """Handle follow-up questions after code generation"""
+    response = "I've generated the code based on your requirements. You can download it using the link provided above. Is there anything else you'd like me to help with?"
+    add_message("assistant", response)
+
+
+# Chat stage -> handler for the user's message in that stage
+_STAGE_HANDLERS = {
+    "greeting": _handle_greeting,
+    "collecting_requirements": _handle_collecting,
+    "planning": _handle_planning,
+    "generating": _handle_generating,
+}
+
+
+async def process_user_input(user_input: str, live_placeholder: DeltaGenerator):
     """Process user input and generate appropriate response"""
     # Add user message to chat
     add_message("user", user_input)
     
-    # Set assistant typing indicator
-    st.session_state.assistant_typing = True
-    
     # Process based on current chat stage
-    if st.session_state.chat_stage == "greeting":
-        # Move to requirements collection stage
-        st.session_state.chat_stage = "collecting_requirements"
-        response = "Thanks for that introduction! Let me ask a few questions to better understand your requirements."
-        add_message("assistant", response)
-        
-    elif st.session_state.chat_stage == "collecting_requirements":
-        # Check if we have enough information to create a plan
-        # In a real implementation, this would be more sophisticated
-        if len(user_input) > 50:  # Simple check for sufficient detail
-            # Generate technical plan
-            plan_response = await generate_technical_plan(user_input)
-            add_message("assistant", plan_response)
-            st.session_state.chat_stage = "planning"
-        else:
-            # Ask for more details
-            response = "I'd like to understand your requirements better. Could you provide more details about what you're looking to build?"
-            add_message("assistant", response)
-            
-    elif st.session_state.chat_stage == "planning":
-        # Check if user wants to generate code
-        if user_input.strip().lower() == "/code":
-            # Generate code
-            code_response = generate_code_from_plan()
-            add_message("assistant", code_response)
-            st.session_state.chat_stage = "generating"
-        else:
-            # Continue refining requirements
-            response = "I'm still collecting requirements. When you're ready to generate code based on the plan, please type `/code`."
-            add_message("assistant", response)
-            
-    elif st.session_state.chat_stage == "generating":
-        # After code generation, handle follow-up questions
-        response = "I've generated the code based on your requirements. You can download it using the link provided above. Is there anything else you'd like me to help with?"
-        add_message("assistant", response)
-    
-    # Remove typing indicator
-    st.session_state.assistant_typing = False
+    await _STAGE_HANDLERS[st.session_state.chat_stage](user_input, live_placeholder)
 
 
-async def generate_technical_plan(user_requirements: str) -> str:
-    """Generate a technical implementation plan from user requirements using AI planning agent"""
-    try:
-        # Use the existing AI planning agent from the project
-        from workflows.agent_orchestration_engine import run_chat_planning_agent
-        import logging
-        
-        # Create a simple logger for the planning agent
-        logger = logging.getLogger("chat_planning")
-        logger.setLevel(logging.INFO)
-        
-        # Call the AI planning agent to generate a technical plan
-        plan_result = await run_chat_planning_agent(user_requirements, logger)
-        
-        # Format the response for the chat interface
-        plan = f"""✅ Thanks for the detailed requirements! I've analyzed what you're looking to build and here's my technical implementation plan:
+_PLAN_INTRO = """✅ Thanks for the detailed requirements! I've analyzed what you're looking to build and here's my technical implementation plan:
 
 ## Technical Implementation Plan
 
-{plan_result}
+"""
 
-When you're ready to generate the actual code based on this plan, simply type `/code` and I'll create the implementation for you!"""
+_PLAN_OUTRO = """
 
-        # Store the plan for later use
-        st.session_state.current_plan = plan
-        
-        return plan
-        
-    except Exception as e:
-        # Fallback to simulated plan if AI planning fails
-        plan = f"""✅ Thanks for the detailed requirements! I've analyzed what you're looking to build and here's my technical implementation plan:
+When you're ready to generate the actual code based on this plan, simply type `/code` and I'll create the implementation for you!"""
 
-## Technical Implementation Plan
 
-**Project Overview:**
-{user_requirements[:100]}...
+# Fallback plan body used when the planning agent is unavailable
+_FALLBACK_PLAN_TEMPLATE = """**Project Overview:**
+{reqs}...
 
 **Implementation Approach:**
 1. **Architecture Design** - Define system components and data flow
@@ -287,44 +448,81 @@ project/
 ├── tests/
 ├── requirements.txt
 └── README.md
-```
+```"""
 
-When you're ready to generate the actual code based on this plan, simply type `/code` and I'll create the implementation for you!"""
 
-        # Store the plan for later use
-        st.session_state.current_plan = plan
-        
-        return plan
+async def generate_technical_plan(user_requirements: str) -> AsyncIterator[str]:
+    """Stream a technical implementation plan from user requirements using AI planning agent"""
+    # Show the introduction right away while the planning agent works
+    yield _PLAN_INTRO
+
+    # Use the existing AI planning agent from the project
+    planning_agent, logger = get_planning_agent()
+    try:
+        # Call the AI planning agent to generate a technical plan
+        plan_result = await planning_agent(user_requirements, logger)
+        plan_body = str(plan_result)
+    except (ConnectionError, TimeoutError, asyncio.TimeoutError, RuntimeError) as e:
+        # Fallback to simulated plan if AI planning fails
+        logger.warning("Planning agent failed, using fallback plan: %s", e)
+        plan_body = _FALLBACK_PLAN_TEMPLATE.format(reqs=user_requirements[:100])
+
+    # Scaffolding: the agent only returns a finished plan, so the body arrives as
+    # one chunk after the full await. The stream throttle only takes effect once
+    # the engine exposes a token stream to iterate here.
+    yield plan_body
+    yield _PLAN_OUTRO
+
+    # Store the plan for later use
+    st.session_state.current_plan = _PLAN_INTRO + plan_body + _PLAN_OUTRO
+
+
+def build_code_archive(project_files: Dict[str, str]) -> Tuple[bytes, str, str]:
+    """Package generated files into an in-memory archive
+
+    Returns the archive bytes together with its file extension and MIME type.
+    """
+    encoded_files = {name: content.encode("utf-8") for name, content in project_files.items()}
+    total_size = sum(len(data) for data in encoded_files.values())
+
+    # Large projects use multi-threaded zstd when it is available
+    if total_size > ARCHIVE_COMPRESSION_THRESHOLD and zstandard is not None:
+        archive_buffer = io.BytesIO()
+        compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+        with compressor.stream_writer(archive_buffer, closefd=False) as zstd_stream:
+            with tarfile.open(fileobj=zstd_stream, mode="w|") as tar_file:
+                mtime = int(time.time())
+                for filename, data in encoded_files.items():
+                    info = tarfile.TarInfo(filename)
+                    info.size = len(data)
+                    info.mtime = mtime
+                    tar_file.addfile(info, io.BytesIO(data))
+        return archive_buffer.getvalue(), ".tar.zst", "application/zstd"
+
+    # Small projects aren't worth the compression CPU; store them as-is
+    compression = (
+        zipfile.ZIP_DEFLATED if total_size > ARCHIVE_COMPRESSION_THRESHOLD else zipfile.ZIP_STORED
+    )
+    archive_buffer = io.BytesIO()
+    with zipfile.ZipFile(archive_buffer, "w", compression) as zip_file:
+        for filename, data in encoded_files.items():
+            zip_file.writestr(filename, data)
+    return archive_buffer.getvalue(), ".zip", "application/zip"
 
 
 def generate_code_from_plan() -> str:
-    """Generate code based on the technical plan using the project's code generation pipeline"""
+    """Generate a placeholder project from the technical plan"""
     try:
         # Set processing state
         st.session_state.processing = True
         
-        # Use the existing code generation pipeline from the project
-        from workflows.agent_orchestration_engine import execute_chat_based_planning_pipeline
-        import logging
-        
-        # Create a simple logger
-        logger = logging.getLogger("code_generation")
-        logger.setLevel(logging.INFO)
-        
         # Get the current plan from session state
         user_requirements = st.session_state.current_plan or "Generate code based on the technical plan"
         
-        # Execute the chat-based planning pipeline to generate code
-        # This will create the actual code implementation based on the plan
-        result = asyncio.run(execute_chat_based_planning_pipeline(
-            user_input=user_requirements,
-            logger=logger,
-            progress_callback=None,
-            enable_indexing=True
-        ))
-        
-        # For now, we'll create a simple project structure as a placeholder
-        # In a real implementation, we would extract the generated code from the result
+        # For now, we'll create a simple project structure as a placeholder.
+        # The code generation pipeline isn't called until its output can be
+        # turned into project files; running it only to discard the result
+        # paid for a full pipeline round-trip on every /code.
         project_files = {
             "README.md": f"""# Generated Project
 
@@ -360,22 +558,13 @@ if __name__ == "__main__":
 ''',
         }
         
-        # Create a zip file of the generated code
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for filename, content in project_files.items():
-                zip_file.writestr(filename, content)
-        
-        # Save to a temporary file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        zip_filename = f"generated_code_{timestamp}.zip"
-        zip_path = os.path.join("/tmp", zip_filename)
+        # Create an archive of the generated code
+        archive_bytes, extension, mime = build_code_archive(project_files)
         
-        with open(zip_path, "wb") as f:
-            f.write(zip_buffer.getvalue())
-        
-        # Store the path for download
-        st.session_state.generated_code_path = zip_path
+        # Keep the archive in memory for the download button
+        st.session_state.generated_code_bytes = archive_bytes
+        st.session_state.generated_code_name = f"generated_code_{time.time_ns()}{extension}"
+        st.session_state.generated_code_mime = mime
         st.session_state.code_generated = True
         
         response = f"""🎉 Great! I've generated the code based on your requirements and technical plan.
@@ -398,49 +587,65 @@ if __name__ == "__main__":
         st.session_state.processing = False
 
 
+def queue_user_input():
+    """Queue the submitted message so the chat fragment can process it"""
+    user_input = st.session_state.get("user_input")
+    if user_input:
+        st.session_state.pending_user_input = user_input
+
+
+@st.fragment
 def render_chat_interface():
-    """Render the main chat interface"""
-    # Display header
-    display_header()
-    
+    """Render the main chat interface
+
+    Runs as a fragment so a form submit only reruns the chat block, not the
+    header, sidebar, footer and styles around it.
+    """
     st.markdown("### 💬 AI Coding Assistant")
     st.markdown("Describe your coding project and I'll help you generate the implementation!")
     
     # Display chat messages
-    display_chat_messages()
+    history_placeholder, live_placeholder, committed_count = display_chat_messages()
+    
+    # Process a message queued by the form before rendering state-dependent widgets
+    user_input = st.session_state.pop("pending_user_input", None)
+    if user_input:
+        try:
+            # Run on the session's persistent event loop
+            with st.spinner("Thinking…"):
+                get_event_loop().run_until_complete(
+                    process_user_input(user_input, live_placeholder)
+                )
+        except Exception as e:
+            st.error(f"❌ Sorry, I encountered an error while processing your message: {str(e)}")
+        
+        # Keep the retained history bounded, then show the new messages
+        evicted_count = trim_chat_history()
+        commit_chat_history(history_placeholder, live_placeholder, committed_count, evicted_count)
     
     # Show download button if code was generated
-    if st.session_state.code_generated and st.session_state.generated_code_path:
-        with open(st.session_state.generated_code_path, "rb") as f:
-            st.download_button(
-                label="📥 Download Generated Code (ZIP)",
-                data=f,
-                file_name=os.path.basename(st.session_state.generated_code_path),
-                mime="application/zip",
-                use_container_width=True,
-            )
+    if st.session_state.code_generated and st.session_state.generated_code_bytes:
+        st.download_button(
+            label="📥 Download Generated Code",
+            data=st.session_state.generated_code_bytes,
+            file_name=st.session_state.generated_code_name,
+            mime=st.session_state.generated_code_mime,
+            use_container_width=True,
+        )
     
     # Show command hint if in planning stage
     if st.session_state.chat_stage == "planning":
-        st.markdown(
-            '<div class="command-hint">Type <code>/code</code> to generate the implementation</div>',
-            unsafe_allow_html=True,
-        )
+        st.html('<div class="command-hint">Type <code>/code</code> to generate the implementation</div>')
     
     # Input area for user messages
     with st.form(key="chat_input", clear_on_submit=True):
-        user_input = st.text_area(
+        st.text_area(
             "Your message:",
             placeholder="Describe your coding requirements or ask questions...",
             height=100,
             key="user_input"
         )
-        submit_button = st.form_submit_button("Send")
-        
-        if submit_button and user_input:
-            # Use asyncio to run the async function
-            asyncio.run(process_user_input(user_input))
-            st.rerun()
+        st.form_submit_button("Send", on_click=queue_user_input)
 
 
 def chat_main_layout():
@@ -454,22 +659,15 @@ def chat_main_layout():
     # Apply custom styles
     apply_chat_styles()
     
-    # Add custom CSS for this page
-    st.markdown(
-        """
-        <style>
-        header.stHeader { visibility: hidden; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-    
     # Render sidebar
     sidebar_info = sidebar_control_panel()
     
     # Show initial greeting if this is the first visit
     if not st.session_state.messages:
-        add_message("assistant", get_assistant_greeting())
+        st.session_state.messages.append(dict(_GREETING_MESSAGE))
+    
+    # Display header
+    display_header()
     
     # Render main chat interface
     render_chat_interface()